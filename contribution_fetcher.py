@@ -0,0 +1,514 @@
+import asyncio
+import functools
+import hashlib
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable
+
+import httpx
+import orjson
+from tqdm import tqdm
+
+logger = logging.getLogger(__name__)
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+# Upper bound on in-flight GraphQL requests, to stay clear of GitHub's secondary rate limits
+MAX_CONCURRENT_REQUESTS = 10
+MAX_RETRIES = 5
+REQUEST_TIMEOUT = 30.0
+GRAPHQL_CACHE_DIR = ".graphql_cache"
+# Seconds a cached GraphQL response is served without asking GitHub again
+GRAPHQL_CACHE_TTL = 60 * 60
+# Seconds after which a cached response is deleted instead of revalidated
+GRAPHQL_CACHE_MAX_AGE = 7 * 24 * 60 * 60
+
+
+def get_retry_delay(response: httpx.Response, attempt: int) -> float | None:
+    """
+    Work out how long to wait before retrying a failed GraphQL request.
+
+    Args:
+        response (httpx.Response): The failed response
+        attempt (int): Zero-based number of the attempt that failed
+
+    Returns:
+        float | None: Seconds to wait, or None if the request should not be retried
+    """
+    if "retry-after" in response.headers:
+        return float(response.headers["retry-after"])
+    if response.headers.get("x-ratelimit-remaining") == "0":
+        reset_at = float(response.headers.get("x-ratelimit-reset", time.time()))
+        return max(reset_at - time.time(), 0) + 1
+    if response.status_code in (502, 503, 504):
+        return 2**attempt
+    return None
+
+
+def get_cache_path(query: str, variables: dict | None, token: str = "") -> Path:
+    """
+    Get the on-disk cache file for a GraphQL query and its variables.
+
+    The token is part of the key, so a cached response is only ever served to
+    a client that sends the same credentials it was fetched with.
+    """
+    key = hashlib.blake2b(
+        query.encode()
+        + orjson.dumps(variables, option=orjson.OPT_SORT_KEYS)
+        + hashlib.blake2b(token.encode(), digest_size=16).digest(),
+        digest_size=16,
+    ).hexdigest()
+    return Path(GRAPHQL_CACHE_DIR) / f"{key}.json"
+
+
+def read_cache_entry(cache_path: Path) -> tuple[dict | None, float]:
+    """
+    Read a cached GraphQL response.
+
+    Returns:
+        tuple[dict | None, float]: The cached entry and its age in seconds, or
+            (None, 0) when there is no usable entry. Unreadable or corrupt
+            files count as a cache miss.
+    """
+    try:
+        age = time.time() - cache_path.stat().st_mtime
+        cached = orjson.loads(cache_path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None, 0
+    if not isinstance(cached, dict) or "response" not in cached:
+        return None, 0
+    return cached, age
+
+
+def write_cache_entry(cache_path: Path, entry: dict):
+    """
+    Atomically write a cache entry, so concurrent readers never see a partial file.
+    """
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps(entry))
+        os.replace(tmp_name, cache_path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def prune_cache():
+    """
+    Delete cached responses, and temp files left by interrupted writes, older
+    than `GRAPHQL_CACHE_MAX_AGE`.
+    """
+    cutoff = time.time() - GRAPHQL_CACHE_MAX_AGE
+    for path in Path(GRAPHQL_CACHE_DIR).glob("*.*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            # Removed by another process in the meantime
+            pass
+
+
+async def run_graphql_query(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    query: str,
+    variables: dict | None = None,
+    on_result: Callable[[dict], bool] | None = None,
+    use_cache: bool = True,
+) -> dict:
+    """
+    Run a GraphQL query, retrying when GitHub asks us to back off.
+
+    With `use_cache`, responses are cached on disk for `GRAPHQL_CACHE_TTL`
+    seconds. Once stale, the stored ETag is sent as `If-None-Match` so an
+    unchanged result can be answered with a 304 instead of a full page.
+
+    Every result is handed to `on_result` before it is returned. A response is
+    only cached once `on_result` has processed it successfully, and a cached
+    response it fails on is dropped, so a bad page is never served again.
+
+    Args:
+        client (httpx.AsyncClient): Authenticated client shared by all requests
+        semaphore (asyncio.Semaphore): Limits the number of concurrent requests
+        query (str): GraphQL query document
+        variables (dict | None): Variables for the query
+        on_result (Callable[[dict], bool] | None): Processes the result, returning
+            whether it could be used
+        use_cache (bool): Whether to read and write the on-disk response cache
+    """
+    cached = None
+    if use_cache:
+        cache_path = get_cache_path(
+            query, variables, client.headers.get("Authorization", "")
+        )
+        cached, age = read_cache_entry(cache_path)
+        if cached and age < GRAPHQL_CACHE_TTL:
+            if on_result is not None and not on_result(cached["response"]):
+                cache_path.unlink(missing_ok=True)
+            return cached["response"]
+
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+
+    for attempt in range(MAX_RETRIES + 1):
+        async with semaphore:
+            response = await client.post(
+                GRAPHQL_URL,
+                content=orjson.dumps({"query": query, "variables": variables}),
+                headers=headers,
+            )
+        if response.status_code == 304:
+            if on_result is not None and not on_result(cached["response"]):
+                cache_path.unlink(missing_ok=True)
+            else:
+                # Unchanged upstream, mark the cached entry fresh again
+                cache_path.touch()
+            return cached["response"]
+        if response.status_code == 200:
+            result = orjson.loads(response.content)
+            usable = on_result is None or on_result(result)
+            if use_cache and usable and "errors" not in result:
+                write_cache_entry(
+                    cache_path,
+                    {"etag": response.headers.get("etag"), "response": result},
+                )
+            return result
+
+        delay = get_retry_delay(response, attempt)
+        if delay is None or attempt == MAX_RETRIES:
+            break
+        await asyncio.sleep(delay)
+
+    raise Exception(f"Query failed: {response.status_code} - {response.text}")
+
+
+# One aliased `search` field of the batched query; `{alias}` is filled in per search.
+# Each PR carries its author and the number of reviews left by `$<alias>_login`,
+# so authored and reviewed PRs come out of a single search.
+SEARCH_FIELD_TEMPLATE = """
+  {alias}: search(
+    query: ${alias}_query
+    type: ISSUE_ADVANCED
+    first: 100
+    after: ${alias}_cursor
+  ) {{
+    issueCount
+    nodes {{
+      ... on PullRequest {{
+        createdAt
+        author {{
+          login
+        }}
+        reviews(first: 1, author: ${alias}_login) {{
+          totalCount
+        }}
+      }}
+    }}
+    pageInfo {{
+      hasNextPage
+      endCursor
+    }}
+  }}"""
+# Upper bound on aliased searches folded into a single GraphQL request
+MAX_SEARCHES_PER_QUERY = 10
+# GitHub search never returns more than this many results for one query
+SEARCH_RESULT_LIMIT = 1000
+
+
+@functools.lru_cache(maxsize=None)
+def build_batched_query(aliases: tuple) -> str:
+    """
+    Build one GraphQL query document holding an aliased `search` field per alias.
+
+    The batch of aliases usually stays the same across pagination rounds, so
+    documents are cached and reused rather than rebuilt for every page.
+
+    Args:
+        aliases (tuple): Aliases of the searches to include
+
+    Returns:
+        str: Query taking `$<alias>_query`, `$<alias>_login` and `$<alias>_cursor`
+            variables per alias
+    """
+    params = ", ".join(
+        f"${a}_query: String!, ${a}_login: String!, ${a}_cursor: String"
+        for a in aliases
+    )
+    fields = "".join(SEARCH_FIELD_TEMPLATE.format(alias=alias) for alias in aliases)
+    return f"query({params}) {{{fields}\n}}"
+
+
+async def fetch_searches(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    searches: dict,
+    on_page: Callable[[str, list], None],
+    on_truncated: Callable[[str], None] | None = None,
+    use_cache: bool = True,
+) -> dict:
+    """
+    Page through several PR searches at once, handing each page to `on_page`.
+
+    Every round folds the searches that still have pages left into batched
+    queries of up to `MAX_SEARCHES_PER_QUERY` aliases, so M searches take
+    max(pages) round-trips instead of sum(pages).
+
+    GitHub stops a search at `SEARCH_RESULT_LIMIT` results. A search whose
+    first page reports more than that is handed to `on_truncated` instead of
+    `on_page` and not paged any further; without `on_truncated`, a warning is
+    logged and the search is paged up to the limit.
+
+    Args:
+        client (httpx.AsyncClient): Authenticated client shared by all requests
+        semaphore (asyncio.Semaphore): Limits the number of concurrent requests
+        searches (dict): Mapping of alias to a (search query, username) tuple
+        on_page (Callable[[str, list], None]): Called with the alias and PR nodes
+            of every page, so pages can be consumed and dropped as they arrive
+        on_truncated (Callable[[str], None] | None): Called with the alias of
+            every search that holds more results than GitHub returns
+        use_cache (bool): Whether to read and write the on-disk response cache
+
+    Returns:
+        dict: Mapping of alias to the exception raised, for the searches that failed
+    """
+    errors = {}
+    cursors = dict.fromkeys(searches)
+    pending = list(searches)
+    next_pending = []
+
+    fetched = 0
+
+    def handle_batch(batch: list, response: dict) -> bool:
+        """
+        Hand every search of a batched response on, returning whether all succeeded.
+        """
+        nonlocal fetched
+        handled = True
+        graphql_errors = response.get("errors", [])
+        data = response.get("data") or {}
+        for alias in batch:
+            search = data.get(alias)
+            if search is None:
+                # Report the errors raised for this alias, or all of them if none match
+                alias_errors = [
+                    e for e in graphql_errors if (e.get("path") or [None])[0] == alias
+                ]
+                errors[alias] = Exception(
+                    f"GraphQL Error: {alias_errors or graphql_errors}"
+                )
+                handled = False
+                continue
+
+            # A malformed page only fails its own search, not the batch
+            try:
+                if cursors[alias] is None:
+                    # The first page tells us how many PRs the search will yield
+                    issue_count = search["issueCount"]
+                    if issue_count > SEARCH_RESULT_LIMIT:
+                        if on_truncated is not None:
+                            on_truncated(alias)
+                            continue
+                        logger.warning(
+                            "Search %r matches %d PRs, but GitHub only returns"
+                            " the first %d",
+                            searches[alias][0],
+                            issue_count,
+                            SEARCH_RESULT_LIMIT,
+                        )
+                    pbar.total = (pbar.total or 0) + min(
+                        issue_count, SEARCH_RESULT_LIMIT
+                    )
+                    pbar.refresh()
+                on_page(alias, search["nodes"])
+                pbar.update(len(search["nodes"]))
+                fetched += len(search["nodes"])
+
+                if search["pageInfo"]["hasNextPage"]:
+                    cursors[alias] = search["pageInfo"]["endCursor"]
+                    next_pending.append(alias)
+            except Exception as e:
+                errors[alias] = e
+                handled = False
+        return handled
+
+    # A progress bar is only useful on a terminal; CI logs get a summary line instead
+    with tqdm(desc="Fetching PRs", disable=not sys.stderr.isatty()) as pbar:
+        while pending:
+            batches = [
+                pending[i : i + MAX_SEARCHES_PER_QUERY]
+                for i in range(0, len(pending), MAX_SEARCHES_PER_QUERY)
+            ]
+            next_pending = []
+            # Each response is handled as it arrives, before it may be cached
+            responses = await asyncio.gather(
+                *(
+                    run_graphql_query(
+                        client,
+                        semaphore,
+                        build_batched_query(tuple(batch)),
+                        {
+                            **{f"{a}_query": searches[a][0] for a in batch},
+                            **{f"{a}_login": searches[a][1] for a in batch},
+                            **{f"{a}_cursor": cursors[a] for a in batch},
+                        },
+                        functools.partial(handle_batch, batch),
+                        use_cache,
+                    )
+                    for batch in batches
+                ),
+                return_exceptions=True,
+            )
+
+            for batch, response in zip(batches, responses):
+                if isinstance(response, Exception):
+                    errors.update(dict.fromkeys(batch, response))
+            pending = next_pending
+
+    logger.info("Fetched %d PRs across %d search(es)", fetched, len(searches))
+    return errors
+
+
+def get_month_year(date_str):
+    # GitHub's DateTime scalar is ISO-8601 with a 4-digit year, so "YYYY-MM" is a prefix
+    return date_str[:7]
+
+
+def count_contributions(
+    prs: list,
+    username: str,
+    authored_counts: Counter,
+    reviewed_counts: Counter,
+    exclude_authored_from_reviewed: bool = False,
+):
+    """
+    Add a page of PR nodes to the per-month authored and reviewed counts.
+
+    Args:
+        prs (list): PR nodes authored or reviewed by the user
+        username (str): GitHub username the PRs were searched for
+        authored_counts (Counter): Authored PRs per "YYYY-MM" month, updated in place
+        reviewed_counts (Counter): Reviewed PRs per "YYYY-MM" month, updated in place
+        exclude_authored_from_reviewed (bool): Whether to exclude PRs authored by the user from the reviewed count
+    """
+    login = username.lower()
+    for pr in prs:
+        month = get_month_year(pr["createdAt"])
+        # Authors of deleted accounts come back as null
+        is_authored = (pr["author"] or {}).get("login", "").lower() == login
+        if is_authored:
+            authored_counts[month] += 1
+        if pr["reviews"]["totalCount"] and not (
+            exclude_authored_from_reviewed and is_authored
+        ):
+            reviewed_counts[month] += 1
+
+
+async def fetch_contribution_counts(
+    targets: list,
+    github_token: str,
+    exclude_authored_from_reviewed: bool = False,
+    use_cache: bool = True,
+) -> list:
+    """
+    Count the PRs each target authored and reviewed per month.
+
+    All targets are searched together in batched queries over one client.
+    Each target is a single `author:U OR reviewed-by:U` search, unless that
+    holds more PRs than one GitHub search returns; such targets are searched
+    again with separate authored and reviewed searches, each with its own limit.
+
+    Args:
+        targets (list): List of (username, repo_owner, repo_name) tuples
+        github_token (str): GitHub token for API access
+        exclude_authored_from_reviewed (bool): Whether to exclude PRs authored by the user from the reviewed count
+        use_cache (bool): Whether to read and write the on-disk response cache
+
+    Returns:
+        list: One entry per target, holding an (authored_counts, reviewed_counts)
+            tuple of Counters keyed by "YYYY-MM" month, or the exception raised
+            for that target
+    """
+    headers = {
+        "Authorization": f"Bearer {github_token}",
+        "Content-Type": "application/json",
+    }
+
+    repo_queries = {
+        f"target{i}": (f"repo:{repo_owner}/{repo_name} is:pr", username)
+        for i, (username, repo_owner, repo_name) in enumerate(targets)
+    }
+    # One search per target, partitioned into authored and reviewed PRs client-side
+    searches = {
+        alias: (f"{repo_query} (author:{username} OR reviewed-by:{username})", username)
+        for alias, (repo_query, username) in repo_queries.items()
+    }
+
+    # Authored and reviewed PRs per month for every target, filled in page by page
+    counts = {alias: (Counter(), Counter()) for alias in searches}
+
+    def on_page(alias, prs):
+        count_contributions(
+            prs, searches[alias][1], *counts[alias], exclude_authored_from_reviewed
+        )
+
+    # Authored-only and reviewed-only searches for the targets too large for one
+    split_searches = {}
+
+    def on_truncated(alias):
+        repo_query, username = repo_queries[alias]
+        split_searches[f"{alias}_authored"] = (
+            f"{repo_query} author:{username}",
+            username,
+        )
+        split_searches[f"{alias}_reviewed"] = (
+            f"{repo_query} reviewed-by:{username}",
+            username,
+        )
+
+    def on_split_page(split_alias, prs):
+        alias, kind = split_alias.rsplit("_", 1)
+        authored_counts, reviewed_counts = counts[alias]
+        # Each search counts towards its own kind only
+        if kind == "authored":
+            count_contributions(prs, searches[alias][1], authored_counts, Counter())
+        else:
+            count_contributions(
+                prs,
+                searches[alias][1],
+                Counter(),
+                reviewed_counts,
+                exclude_authored_from_reviewed,
+            )
+
+    if use_cache:
+        prune_cache()
+
+    logger.info("Fetching authored and reviewed PRs for %d target(s)...", len(targets))
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    async with httpx.AsyncClient(
+        http2=True, headers=headers, timeout=REQUEST_TIMEOUT
+    ) as client:
+        errors = await fetch_searches(
+            client, semaphore, searches, on_page, on_truncated, use_cache
+        )
+        if split_searches:
+            logger.info(
+                "Searching authored and reviewed PRs separately for %d target(s)"
+                " with more than %d PRs...",
+                len(split_searches) // 2,
+                SEARCH_RESULT_LIMIT,
+            )
+            split_errors = await fetch_searches(
+                client, semaphore, split_searches, on_split_page, use_cache=use_cache
+            )
+            for split_alias, error in split_errors.items():
+                errors.setdefault(split_alias.rsplit("_", 1)[0], error)
+
+    return [errors.get(alias, counts[alias]) for alias in searches]
@@ -1,176 +1,120 @@
+import asyncio
+import dataclasses
+import logging
+import logging.handlers
 import os
 import sys
-from datetime import datetime
-from pathlib import Path
+from collections import Counter
 
 import click
-import pandas as pd
-from tqdm import tqdm
-import requests
 
-from svg_renderer import render_contribution_svg
+from contribution_fetcher import fetch_contribution_counts
+from svg_renderer import render_many
 from themes import THEME_URI, Theme, get_themes
 from target_parser import parse_targets
 
+# Progress messages buffered before being written out together
+LOG_BUFFER_CAPACITY = 1024
+# Loggers whose progress messages are shown; everything else, such as httpx's
+# per-request lines, only gets through from WARNING up
+PROGRESS_LOGGERS = ("contribution_fetcher", "svg_renderer", "themes")
 
-def generate_contribution_graph(
+
+def setup_logging():
+    """
+    Send progress messages to stdout, buffering them so a batch run writes them
+    out together instead of once per message. Warnings and errors flush the
+    buffer right away.
+    """
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    handler = logging.handlers.MemoryHandler(
+        LOG_BUFFER_CAPACITY, flushLevel=logging.WARNING, target=stream_handler
+    )
+    logging.basicConfig(level=logging.WARNING, handlers=[handler])
+    for name in PROGRESS_LOGGERS:
+        logging.getLogger(name).setLevel(logging.INFO)
+
+
+def build_render_job(
     username: str,
     repo_owner: str,
     repo_name: str,
+    authored_counts: Counter,
+    reviewed_counts: Counter,
     theme: Theme,
     output_dir: str = ".",
-    exclude_authored_from_reviewed: bool = False,
-):
+) -> dict:
     """
-    Generate a contribution graph for a user's PRs in a specific repository.
+    Build the `render_contribution_svg` arguments for a user's PRs in a specific repository.
 
     Args:
         username (str): GitHub username to analyze
         repo_owner (str): Owner of the repository
         repo_name (str): Name of the repository
-        output_dir (str): Directory to save the output PNG file
-        exclude_authored_from_reviewed (bool): Whether to exclude PRs authored by the user from the reviewed count
+        authored_counts (Counter): Authored PRs per "YYYY-MM" month
+        reviewed_counts (Counter): Reviewed PRs per "YYYY-MM" month
         theme (Theme): Theme object for styling the SVG
+        output_dir (str): Directory to save the output SVG file
     """
-    # GitHub API setup
-    GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-    if not GITHUB_TOKEN:
-        raise ValueError("GITHUB_TOKEN environment variable is not set")
-
-    # Create output directory if it doesn't exist
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
-
-    HEADERS = {
-        "Authorization": f"Bearer {GITHUB_TOKEN}",
-        "Content-Type": "application/json",
-    }
+    # "YYYY-MM" strings sort chronologically
+    months = sorted(authored_counts.keys() | reviewed_counts.keys())
 
-    def run_graphql_query(query, variables=None):
-        response = requests.post(
-            "https://api.github.com/graphql",
-            headers=HEADERS,
-            json={"query": query, "variables": variables},
-        )
-        if response.status_code != 200:
-            raise Exception(f"Query failed: {response.status_code} - {response.text}")
-        return response.json()
-
-    def get_month_year(date_str):
-        # Handle both formats: with and without timezone
-        if "+" in date_str:
-            date = datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%S%z")
-        else:
-            date = datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%SZ")
-        return date.strftime("%Y-%m")
-
-    def fetch_prs_with_cursor(query, variables, desc):
-        prs = []
-        has_next_page = True
-        end_cursor = None
-
-        with tqdm(desc=desc) as pbar:
-            while has_next_page:
-                variables["cursor"] = end_cursor
-                result = run_graphql_query(query, variables)
-
-                if "errors" in result:
-                    raise Exception(f"GraphQL Error: {result['errors']}")
-
-                prs_data = result["data"]["search"]["edges"]
-                prs.extend([edge["node"] for edge in prs_data])
-
-                page_info = result["data"]["search"]["pageInfo"]
-                has_next_page = page_info["hasNextPage"]
-                end_cursor = page_info["endCursor"]
-
-                pbar.update(len(prs_data))
+    return dict(
+        username=username,
+        repo_owner=repo_owner,
+        repo_name=repo_name,
+        months=months,
+        authored_values=[authored_counts[month] for month in months],
+        reviewed_values=[reviewed_counts[month] for month in months],
+        theme=theme,
+        output_dir=output_dir,
+    )
 
-        return prs
 
-    # GraphQL query template
-    prs_query = """
-    query($cursor: String, $searchQuery: String!) {
-      search(
-        query: $searchQuery
-        type: ISSUE
-        first: 100
-        after: $cursor
-      ) {
-        edges {
-          node {
-            ... on PullRequest {
-              createdAt
-            }
-          }
-        }
-        pageInfo {
-          hasNextPage
-          endCursor
-        }
-      }
-    }
+async def generate_contribution_graphs(
+    targets: list,
+    theme: Theme,
+    output_dir: str = ".",
+    exclude_authored_from_reviewed: bool = False,
+    use_cache: bool = True,
+) -> list:
     """
+    Generate contribution graphs for all targets, fetching their PRs in batched queries.
 
-    # Fetch authored PRs
-    print(f"Fetching PRs authored by {username}...")
-    authored_variables = {
-        "searchQuery": f"repo:{repo_owner}/{repo_name} is:pr author:{username}"
-    }
-    authored_prs = fetch_prs_with_cursor(
-        prs_query, authored_variables, "Fetching authored PRs"
-    )
-    authored_dates = [get_month_year(pr["createdAt"]) for pr in authored_prs]
+    Args:
+        targets (list): List of (username, repo_owner, repo_name) tuples
+        theme (Theme): Theme object for styling the SVG
+        output_dir (str): Directory to save the output SVG files
+        exclude_authored_from_reviewed (bool): Whether to exclude PRs authored by the user from the reviewed count
+        use_cache (bool): Whether to reuse GraphQL responses cached by earlier runs
 
-    # Fetch reviewed PRs
-    print(f"\nFetching PRs reviewed by {username}...")
-    reviewed_query = f"repo:{repo_owner}/{repo_name} is:pr reviewed-by:{username}"
-    if exclude_authored_from_reviewed:
-        reviewed_query += f" -author:{username}"
-    reviewed_variables = {"searchQuery": reviewed_query}
-    reviewed_prs = fetch_prs_with_cursor(
-        prs_query, reviewed_variables, "Fetching reviewed PRs"
-    )
-    reviewed_dates = [get_month_year(pr["createdAt"]) for pr in reviewed_prs]
+    Returns:
+        list: One entry per target, holding the exception raised for that target or None
+    """
+    # GitHub API setup
+    GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+    if not GITHUB_TOKEN:
+        raise ValueError("GITHUB_TOKEN environment variable is not set")
 
-    # Create DataFrames for counting
-    authored_df = (
-        pd.DataFrame(authored_dates, columns=["month"])
-        .groupby("month")
-        .size()
-        .reset_index(name="authored_count")
+    counts = await fetch_contribution_counts(
+        targets, GITHUB_TOKEN, exclude_authored_from_reviewed, use_cache
     )
-    reviewed_df = (
-        pd.DataFrame(reviewed_dates, columns=["month"])
-        .groupby("month")
-        .size()
-        .reset_index(name="reviewed_count")
-    )
-
-    # Merge DataFrames
-    merged_df = pd.merge(authored_df, reviewed_df, on="month", how="outer").fillna(0)
-    merged_df["month"] = pd.to_datetime(merged_df["month"], format="%Y-%m")
 
-    # Ensure the dataframe is sorted by month
-    merged_df = merged_df.sort_values("month")
+    # Render every target that was fetched successfully in one batch
+    results = []
+    jobs = {}
+    for i, (target, target_counts) in enumerate(zip(targets, counts)):
+        if isinstance(target_counts, Exception):
+            results.append(target_counts)
+            continue
+        jobs[i] = build_render_job(*target, *target_counts, theme, output_dir)
+        results.append(None)
 
-    # Format month strings
-    months = [dt.strftime("%Y-%m") for dt in merged_df["month"]]
-
-    # Get values
-    authored_values = merged_df["authored_count"].tolist()
-    reviewed_values = merged_df["reviewed_count"].tolist()
-
-    render_contribution_svg(
-        username=username,
-        repo_owner=repo_owner,
-        repo_name=repo_name,
-        months=months,
-        authored_values=authored_values,
-        reviewed_values=reviewed_values,
-        theme=theme,
-        output_dir=output_path,
-    )
+    for i, rendered in zip(jobs, render_many(list(jobs.values()))):
+        if isinstance(rendered, Exception):
+            results[i] = rendered
+    return results
 
 
 @click.command()
@@ -202,6 +146,11 @@ def generate_contribution_graph(
     "--reviewed-color",
     help="Color for reviewed PRs line and points",
 )
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Fetch every page from GitHub instead of reusing responses cached in the last hour",
+)
 def main(
     targets,
     output_dir,
@@ -209,6 +158,7 @@ def main(
     theme,
     authored_color,
     reviewed_color,
+    no_cache,
 ):
     """
     Generate contribution graphs for multiple targets.
@@ -220,41 +170,52 @@ def main(
         theme (str): Theme for the SVG
         authored_color (str): Color for authored PRs line and points
         reviewed_color (str): Color for reviewed PRs line and points
+        no_cache (bool): Whether to bypass the on-disk GraphQL response cache
     """
     available_themes = get_themes()
-    theme: Theme = available_themes.get(theme)
-    if not theme:
+    if theme not in available_themes:
         raise click.BadParameter(
             f"Theme '{theme}' not found. Available themes: {available_themes.keys()}"
         )
     # override theme colors if provided authored_color or reviewed_color
+    overrides = {}
     if authored_color:
-        theme.title_color = f"#{authored_color}"
+        overrides["title_color"] = f"#{authored_color}"
     if reviewed_color:
-        theme.icon_color = f"#{reviewed_color}"
+        overrides["icon_color"] = f"#{reviewed_color}"
+    theme: Theme = dataclasses.replace(available_themes[theme], **overrides)
 
     try:
         parsed_targets = parse_targets(targets)
     except ValueError as e:
         raise click.BadParameter(str(e))
 
-    for target in parsed_targets:
-        try:
-            generate_contribution_graph(
-                target[0],
-                target[1],
-                target[2],
+    try:
+        results = asyncio.run(
+            generate_contribution_graphs(
+                parsed_targets,
                 theme,
                 output_dir,
                 exclude_authored_from_reviewed,
+                use_cache=not no_cache,
             )
-        except Exception as e:
+        )
+    except ValueError as e:
+        click.echo(f"Error generating graphs: {str(e)}", err=True)
+        sys.exit(1)
+
+    failed = False
+    for target, result in zip(parsed_targets, results):
+        if isinstance(result, Exception):
             click.echo(
-                f"Error generating graph for {target[0]} in {target[1]}/{target[2]}: {str(e)}",
+                f"Error generating graph for {target[0]} in {target[1]}/{target[2]}: {str(result)}",
                 err=True,
             )
-            sys.exit(1)
+            failed = True
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
+    setup_logging()
     main()
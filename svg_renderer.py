@@ -1,10 +1,76 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 
 from themes import Theme
 
+logger = logging.getLogger(__name__)
+
 CURVE_RATIO = 0.25
+# Plot area of the chart, in SVG user units (see the template)
+PLOT_LEFT = 100
+PLOT_WIDTH = 1000
+PLOT_BOTTOM = 550
+PLOT_HEIGHT = 450
+# x of the only point of a single-month graph. This is not the plot centre (600);
+# it keeps the point where the original template drew it
+SINGLE_MONTH_X = 550
+# Headroom kept above the highest data point
+Y_AXIS_HEADROOM = 1.1
+TEMPLATE_NAME = "contribution-template.svg.jinja"
+# Large enough to hold a whole graph, so streaming it out costs a single write
+WRITE_BUFFER_SIZE = 1 << 16
+
+# Parse and compile the template once per process; the bytecode cache lets
+# later processes skip compilation as well. Trimming the whitespace around
+# block tags keeps the streamed output free of indentation-only fragments.
+_ENV = Environment(
+    loader=FileSystemLoader(Path(__file__).parent),
+    auto_reload=False,
+    bytecode_cache=FileSystemBytecodeCache(),
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+_TEMPLATE = _ENV.get_template(TEMPLATE_NAME)
+
+
+def get_x_positions(count: int) -> list:
+    """
+    Spread `count` points evenly across the plot width.
+    """
+    if count == 1:
+        return [SINGLE_MONTH_X]
+    return [PLOT_LEFT + (PLOT_WIDTH * i / (count - 1)) for i in range(count)]
+
+
+def get_points(x_positions: list, values: list, max_y_value: float) -> list:
+    """
+    Map values onto the plot, returning one (x, y) point per month.
+    """
+    if max_y_value <= 0:
+        return [(x, PLOT_BOTTOM) for x in x_positions]
+    return [
+        (x, PLOT_BOTTOM - (PLOT_HEIGHT * value / max_y_value))
+        for x, value in zip(x_positions, values)
+    ]
+
+
+def build_curve_path(points: list) -> str:
+    """
+    Build the `d` attribute of a smooth line through the points.
+
+    Each segment is a cubic Bezier whose control points sit `CURVE_RATIO`
+    of the way in from either end, at the height of the end they belong to.
+    """
+    if not points:
+        return ""
+    segments = [f"M{points[0][0]},{points[0][1]}"]
+    for (prev_x, prev_y), (x, y) in zip(points, points[1:]):
+        offset = (x - prev_x) * CURVE_RATIO
+        segments.append(f"C{prev_x + offset},{prev_y} {x - offset},{y} {x},{y}")
+    return " ".join(segments)
 
 
 def render_contribution_svg(
@@ -41,44 +107,69 @@ def render_contribution_svg(
     total_reviewed = sum(reviewed_values)
     max_authored_value = max(authored_values) if authored_values else 0
     max_reviewed_value = max(reviewed_values) if reviewed_values else 0
+    max_y_value = max(max_authored_value, max_reviewed_value) * Y_AXIS_HEADROOM
 
-    # Set up Jinja environment
-    env = Environment(loader=FileSystemLoader("."))
-    template = env.get_template("contribution-template.svg.jinja")
-
-    # Render the template with our data
-    rendered_svg = template.render(
-        username=username,
-        repo_owner=repo_owner,
-        repo_name=repo_name,
-        months=months,
-        authored_values=authored_values,
-        reviewed_values=reviewed_values,
-        total_authored=total_authored,
-        total_reviewed=total_reviewed,
-        max_authored_value=max_authored_value,
-        max_reviewed_value=max_reviewed_value,
-        background_color=theme.background_color,
-        title_color=theme.title_color,
-        authored_color=theme.title_color,
-        reviewed_color=theme.icon_color,
-        text_color=theme.text_color,
-        curve_ratio=CURVE_RATIO,
-    )
+    # Lay out the points and curves here rather than in template loops
+    x_positions = get_x_positions(len(months))
+    authored_points = get_points(x_positions, authored_values, max_y_value)
+    reviewed_points = get_points(x_positions, reviewed_values, max_y_value)
 
-    # Save the rendered SVG to a file
     output_filename = (
         output_path / f"{username}-{repo_owner}-{repo_name}-contribution-graph.svg"
     )
-    with open(output_filename, "w") as f:
-        f.write(rendered_svg)
 
-    print(f"\nContribution graph SVG saved as: {output_filename.absolute()}")
+    # Stream the rendered template straight into the file as UTF-8, whatever
+    # the platform's default encoding and line endings are
+    with open(output_filename, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        _TEMPLATE.stream(
+            username=username,
+            repo_owner=repo_owner,
+            repo_name=repo_name,
+            months=months,
+            authored_values=authored_values,
+            reviewed_values=reviewed_values,
+            total_authored=total_authored,
+            total_reviewed=total_reviewed,
+            max_y_value=max_y_value,
+            x_positions=x_positions,
+            authored_points=authored_points,
+            reviewed_points=reviewed_points,
+            authored_path=build_curve_path(authored_points),
+            reviewed_path=build_curve_path(reviewed_points),
+            background_color=theme.background_color,
+            title_color=theme.title_color,
+            authored_color=theme.title_color,
+            reviewed_color=theme.icon_color,
+            text_color=theme.text_color,
+        ).dump(f, encoding="utf-8")
+
+    logger.info("Contribution graph SVG saved as: %s", output_filename.absolute())
 
     return str(output_filename.absolute())
 
 
+def render_many(jobs: list) -> list:
+    """
+    Render several SVG contribution graphs with the shared compiled template.
+
+    The graphs are rendered and written on a thread pool, as writing the
+    files is I/O-bound.
+
+    Args:
+        jobs (list): List of dicts holding the keyword arguments of `render_contribution_svg`
+
+    Returns:
+        list: One entry per job, holding the path of the saved SVG file or the
+            exception raised for that job
+    """
+    with ThreadPoolExecutor() as executor:
+        futures = [executor.submit(render_contribution_svg, **job) for job in jobs]
+    return [future.exception() or future.result() for future in futures]
+
+
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     # Example usage
     test_months = [
         "2024-10",
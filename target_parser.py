@@ -1,47 +1,51 @@
+import re
 from typing import List, Tuple
 
+# Targets are separated by any run of whitespace and/or commas
+_SEP_RE = re.compile(r"[\s,]+")
+# username@owner/repo, with exactly one '@' and exactly one '/' after it
+_TARGET_RE = re.compile(r"([^@]+)@([^@/]+)/([^@/]+)")
+
+
+def _invalid_target_error(target: str) -> ValueError:
+    """
+    Build the error describing why a target did not match `username@owner/repo`.
+    """
+    if target.count("@") != 1:
+        return ValueError(f"Invalid repository format: {target}")
+    username, _, repo = target.partition("@")
+    if not username or not repo:
+        return ValueError(
+            f"Error parsing target '{target}': Invalid target format: {target}."
+            " Expected format: username@owner/repo"
+        )
+    return ValueError(f"Invalid repository format: {repo}")
+
+
 def parse_targets(targets: str) -> List[Tuple[str, str, str]]:
     """
     Parse a string of targets into a list of (username, repo_owner, repo_name) tuples.
-    
+
     Args:
         targets (str): String containing targets in the format 'username@owner/repo'.
                       Multiple targets can be separated by spaces or commas.
-    
+
     Returns:
         List[Tuple[str, str, str]]: List of tuples containing (username, repo_owner, repo_name)
-    
+
     Raises:
         ValueError: If the input format is invalid
     """
     if not targets or not targets.strip():
         raise ValueError("Empty targets string")
-        
-    # Split by both space and comma, then filter out empty strings
-    target_arr = [t.strip() for t in targets.replace(',', ' ').split() if t.strip()]
+
     parsed_targets = []
-    
-    for target in target_arr:
-        if target.count('@') != 1:
-            raise ValueError(f"Invalid repository format: {target}")
-        try:
-            username, repo = target.split("@")
-            if not username or not repo:
-                raise ValueError(f"Invalid target format: {target}")
-                
-            try:
-                repo_owner, repo_name = repo.split("/")
-                if not repo_owner or not repo_name:
-                    raise ValueError(f"Invalid repository format: {repo}")
-            except ValueError as e:
-                if "not enough values to unpack" in str(e) or "too many values to unpack" in str(e):
-                    raise ValueError(f"Invalid repository format: {repo}")
-                raise
-                
-            parsed_targets.append((username, repo_owner, repo_name))
-        except ValueError as e:
-            if "Invalid repository format" in str(e):
-                raise
-            raise ValueError(f"Error parsing target '{target}': {str(e)}. Expected format: username@owner/repo")
-            
+    for target in _SEP_RE.split(targets):
+        if not target:
+            continue
+        match = _TARGET_RE.fullmatch(target)
+        if match is None:
+            raise _invalid_target_error(target)
+        parsed_targets.append(match.groups())
+
     return parsed_targets
@@ -0,0 +1,391 @@
+import asyncio
+import os
+import time
+from collections import Counter
+
+import httpx
+import orjson
+import pytest
+
+import contribution_fetcher
+from contribution_fetcher import (
+    build_batched_query,
+    count_contributions,
+    fetch_contribution_counts,
+    fetch_searches,
+    get_cache_path,
+    get_month_year,
+    get_retry_delay,
+    prune_cache,
+    run_graphql_query,
+)
+
+
+def make_pr(created_at, author, reviews=0):
+    return {
+        "createdAt": created_at,
+        "author": {"login": author} if author else None,
+        "reviews": {"totalCount": reviews},
+    }
+
+
+def search_page(nodes, end_cursor=None, issue_count=None):
+    return {
+        "issueCount": len(nodes) if issue_count is None else issue_count,
+        "nodes": nodes,
+        "pageInfo": {"hasNextPage": end_cursor is not None, "endCursor": end_cursor},
+    }
+
+
+@pytest.fixture(autouse=True)
+def graphql_cache_dir(tmp_path, monkeypatch):
+    """Keep the GraphQL response cache out of the working directory"""
+    monkeypatch.setattr(contribution_fetcher, "GRAPHQL_CACHE_DIR", tmp_path)
+
+
+def run_fetch_searches(handler, searches):
+    """Run fetch_searches against a mocked GraphQL endpoint"""
+    pages = []
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await fetch_searches(
+                client,
+                asyncio.Semaphore(1),
+                searches,
+                lambda alias, prs: pages.append((alias, prs)),
+            )
+
+    return asyncio.run(run()), pages
+
+
+def run_query(
+    handler,
+    query="query { viewer { login } }",
+    token="token",
+    on_result=None,
+    use_cache=True,
+):
+    """Run run_graphql_query against a mocked GraphQL endpoint"""
+
+    async def run():
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler),
+            headers={"Authorization": f"Bearer {token}"},
+        ) as client:
+            return await run_graphql_query(
+                client, asyncio.Semaphore(1), query, None, on_result, use_cache
+            )
+
+    return asyncio.run(run())
+
+
+def test_get_month_year():
+    """Test extracting the month from GitHub DateTime values"""
+    assert get_month_year("2024-03-15T10:20:30Z") == "2024-03"
+    assert get_month_year("2024-12-01T00:00:00+08:00") == "2024-12"
+
+
+def test_count_contributions():
+    """Test partitioning PRs into authored and reviewed counts"""
+    authored, reviewed = Counter(), Counter()
+    count_contributions(
+        [
+            make_pr("2024-01-02T00:00:00Z", "PeterXCLI"),
+            make_pr("2024-01-05T00:00:00Z", "other", reviews=1),
+            make_pr("2024-02-05T00:00:00Z", "peterxcli", reviews=1),
+        ],
+        "peterxcli",
+        authored,
+        reviewed,
+    )
+    assert authored == Counter({"2024-01": 1, "2024-02": 1})
+    assert reviewed == Counter({"2024-01": 1, "2024-02": 1})
+
+
+def test_count_contributions_exclude_authored():
+    """Test that self-reviewed PRs are left out of the reviewed count when asked"""
+    authored, reviewed = Counter(), Counter()
+    count_contributions(
+        [make_pr("2024-02-05T00:00:00Z", "peterxcli", reviews=1)],
+        "peterxcli",
+        authored,
+        reviewed,
+        exclude_authored_from_reviewed=True,
+    )
+    assert authored == Counter({"2024-02": 1})
+    assert reviewed == Counter()
+
+
+def test_count_contributions_deleted_author():
+    """Test PRs whose author account no longer exists"""
+    authored, reviewed = Counter(), Counter()
+    count_contributions(
+        [make_pr("2024-01-02T00:00:00Z", None, reviews=1)],
+        "peterxcli",
+        authored,
+        reviewed,
+    )
+    assert authored == Counter()
+    assert reviewed == Counter({"2024-01": 1})
+
+
+def test_build_batched_query():
+    """Test that every alias gets its own search field and variables"""
+    query = build_batched_query(("target0", "target1"))
+    for alias in ("target0", "target1"):
+        assert f"{alias}: search(" in query
+        assert f"${alias}_query: String!" in query
+        assert f"${alias}_login: String!" in query
+        assert f"${alias}_cursor: String" in query
+
+
+def test_get_retry_delay():
+    """Test honoring Retry-After and giving up on other client errors"""
+    assert get_retry_delay(httpx.Response(403, headers={"retry-after": "7"}), 0) == 7
+    assert get_retry_delay(httpx.Response(502), 2) == 4
+    assert get_retry_delay(httpx.Response(401), 0) is None
+
+
+def test_fetch_searches_paginates():
+    """Test following cursors until a search runs out of pages"""
+    cursors = []
+
+    def handler(request):
+        cursor = orjson.loads(request.content)["variables"]["target0_cursor"]
+        cursors.append(cursor)
+        pr = make_pr("2024-01-02T00:00:00Z", "peterxcli")
+        page = search_page([pr], "page2" if cursor is None else None)
+        return httpx.Response(200, json={"data": {"target0": page}})
+
+    errors, pages = run_fetch_searches(
+        handler, {"target0": ("repo:apache/ozone is:pr", "peterxcli")}
+    )
+    assert errors == {}
+    assert cursors == [None, "page2"]
+    assert [alias for alias, _ in pages] == ["target0", "target0"]
+
+
+def test_fetch_searches_batch_errors():
+    """Test that an error for one alias does not fail the rest of the batch"""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        pr = make_pr("2024-01-02T00:00:00Z", "peterxcli")
+        return httpx.Response(
+            200,
+            json={
+                "data": {"target0": search_page([pr]), "target1": None},
+                "errors": [{"path": ["target1"], "message": "bad repo"}],
+            },
+        )
+
+    errors, pages = run_fetch_searches(
+        handler,
+        {
+            "target0": ("repo:apache/ozone is:pr", "peterxcli"),
+            "target1": ("repo:apache/missing is:pr", "peterxcli"),
+        },
+    )
+    assert len(requests) == 1
+    assert [alias for alias, _ in pages] == ["target0"]
+    assert list(errors) == ["target1"]
+    assert "bad repo" in str(errors["target1"])
+
+
+def test_fetch_searches_malformed_node(tmp_path):
+    """Test that a page that cannot be counted only fails its own search"""
+
+    def handler(request):
+        pr = make_pr("2024-01-02T00:00:00Z", "peterxcli")
+        return httpx.Response(
+            200,
+            json={"data": {"target0": search_page([pr]), "target1": search_page([{}])}},
+        )
+
+    counts = Counter()
+
+    def on_page(alias, prs):
+        count_contributions(prs, "peterxcli", counts, Counter())
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await fetch_searches(
+                client,
+                asyncio.Semaphore(1),
+                {
+                    "target0": ("repo:apache/ozone is:pr", "peterxcli"),
+                    "target1": ("repo:apache/kafka is:pr", "peterxcli"),
+                },
+                on_page,
+            )
+
+    errors = asyncio.run(run())
+    assert list(errors) == ["target1"]
+    assert isinstance(errors["target1"], KeyError)
+    assert counts == Counter({"2024-01": 1})
+    # The batch holding the malformed page is not cached for later runs
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_run_graphql_query_cache_hit():
+    """Test that a fresh cached response is served without a request"""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"data": {"viewer": {"login": "peterxcli"}}})
+
+    first = run_query(handler)
+    assert run_query(handler) == first
+    assert len(requests) == 1
+
+
+def test_run_graphql_query_cache_keyed_by_token():
+    """Test that a response cached for one token is not served to another"""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"data": {}})
+
+    run_query(handler, token="first")
+    run_query(handler, token="second")
+    assert len(requests) == 2
+    query = "query { viewer { login } }"
+    assert get_cache_path(query, None, "first") != get_cache_path(query, None, "second")
+
+
+def test_run_graphql_query_not_modified():
+    """Test that a stale entry is revalidated with its ETag and served on a 304"""
+    result = {"data": {"viewer": {"login": "peterxcli"}}}
+    run_query(lambda request: httpx.Response(200, json=result, headers={"etag": "v1"}))
+    cache_path = get_cache_path("query { viewer { login } }", None, "Bearer token")
+    stale = time.time() - contribution_fetcher.GRAPHQL_CACHE_TTL - 1
+    os.utime(cache_path, (stale, stale))
+
+    etags = []
+
+    def handler(request):
+        etags.append(request.headers.get("if-none-match"))
+        return httpx.Response(304)
+
+    assert run_query(handler) == result
+    assert etags == ["v1"]
+    assert cache_path.stat().st_mtime > stale
+
+
+def test_run_graphql_query_corrupt_cache():
+    """Test that a truncated cache file is treated as a miss and rewritten"""
+    result = {"data": {"viewer": {"login": "peterxcli"}}}
+    cache_path = get_cache_path("query { viewer { login } }", None, "Bearer token")
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_bytes(b'{"etag": "v1", "resp')
+
+    assert run_query(lambda request: httpx.Response(200, json=result)) == result
+    assert orjson.loads(cache_path.read_bytes())["response"] == result
+    assert list(cache_path.parent.glob("*.tmp")) == []
+
+
+def test_fetch_searches_truncated():
+    """Test that searches over GitHub's result limit are handed off, not paged"""
+    truncated = []
+
+    def handler(request):
+        pr = make_pr("2024-01-02T00:00:00Z", "peterxcli")
+        page = search_page([pr], "page2", issue_count=1500)
+        return httpx.Response(200, json={"data": {"target0": page}})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await fetch_searches(
+                client,
+                asyncio.Semaphore(1),
+                {"target0": ("repo:apache/ozone is:pr", "peterxcli")},
+                lambda alias, prs: pytest.fail("truncated search was paged"),
+                truncated.append,
+            )
+
+    assert asyncio.run(run()) == {}
+    assert truncated == ["target0"]
+
+
+def test_fetch_contribution_counts_split_searches(monkeypatch):
+    """Test falling back to separate authored and reviewed searches past the limit"""
+    queries = []
+
+    def handler(request):
+        variables = orjson.loads(request.content)["variables"]
+        data = {}
+        for name, query in variables.items():
+            if not name.endswith("_query"):
+                continue
+            queries.append(query)
+            alias = name[: -len("_query")]
+            if " OR " in query:
+                pr = make_pr("2024-01-02T00:00:00Z", "peterxcli", reviews=1)
+                data[alias] = search_page([pr], "page2", issue_count=1300)
+            elif "author:" in query:
+                pr = make_pr("2024-01-02T00:00:00Z", "peterxcli")
+                data[alias] = search_page([pr])
+            else:
+                pr = make_pr("2024-02-02T00:00:00Z", "other", reviews=1)
+                data[alias] = search_page([pr])
+        return httpx.Response(200, json={"data": data})
+
+    async_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        httpx,
+        "AsyncClient",
+        lambda **kwargs: async_client(transport=httpx.MockTransport(handler), **kwargs),
+    )
+
+    [(authored, reviewed)] = asyncio.run(
+        fetch_contribution_counts([("peterxcli", "apache", "ozone")], "token")
+    )
+    assert authored == Counter({"2024-01": 1})
+    assert reviewed == Counter({"2024-02": 1})
+    assert queries == [
+        "repo:apache/ozone is:pr (author:peterxcli OR reviewed-by:peterxcli)",
+        "repo:apache/ozone is:pr author:peterxcli",
+        "repo:apache/ozone is:pr reviewed-by:peterxcli",
+    ]
+
+
+def test_run_graphql_query_no_cache(tmp_path):
+    """Test that the cache is neither read nor written when it is turned off"""
+    logins = iter(["first", "second"])
+
+    def handler(request):
+        return httpx.Response(200, json={"data": {"viewer": {"login": next(logins)}}})
+
+    run_query(handler)
+    assert run_query(handler, use_cache=False)["data"]["viewer"]["login"] == "second"
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_run_graphql_query_unusable_response_not_cached(tmp_path):
+    """Test that a response its caller could not process is not cached"""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"data": {"viewer": None}})
+
+    run_query(handler, on_result=lambda result: False)
+    assert list(tmp_path.iterdir()) == []
+    run_query(handler)
+    assert len(requests) == 2
+
+
+def test_prune_cache(tmp_path):
+    """Test that only entries older than the maximum age are deleted"""
+    old, recent = tmp_path / "old.json", tmp_path / "recent.json"
+    old.write_bytes(b"{}")
+    recent.write_bytes(b"{}")
+    expired = time.time() - contribution_fetcher.GRAPHQL_CACHE_MAX_AGE - 1
+    os.utime(old, (expired, expired))
+    prune_cache()
+    assert not old.exists()
+    assert recent.exists()
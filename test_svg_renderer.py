@@ -0,0 +1,95 @@
+from pathlib import Path
+
+from svg_renderer import (
+    PLOT_BOTTOM,
+    SINGLE_MONTH_X,
+    build_curve_path,
+    get_points,
+    get_x_positions,
+    render_many,
+)
+from themes import Theme
+
+THEME = Theme(
+    title_color="#2f80ed",
+    icon_color="#4c71f2",
+    text_color="#434d58",
+    bg_color="#fffefe",
+    background_color="#fffefe",
+)
+
+
+def make_job(username, output_dir):
+    return dict(
+        username=username,
+        repo_owner="apache",
+        repo_name="ozone",
+        months=["2024-01", "2024-02"],
+        authored_values=[1, 2],
+        reviewed_values=[3, 0],
+        theme=THEME,
+        output_dir=str(output_dir),
+    )
+
+
+def test_get_x_positions():
+    """Test spreading points evenly from the left to the right edge of the plot"""
+    assert get_x_positions(3) == [100, 600, 1100]
+    assert get_x_positions(0) == []
+
+
+def test_get_x_positions_single_month():
+    """Test that a single month keeps the original template's x position"""
+    assert get_x_positions(1) == [SINGLE_MONTH_X] == [550]
+
+
+def test_get_points():
+    """Test mapping values onto the plot height"""
+    points = get_points([100, 600, 1100], [0, 5, 10], 10)
+    assert points == [(100, PLOT_BOTTOM), (600, 325), (1100, 100)]
+
+
+def test_get_points_no_contributions():
+    """Test that an all-zero series lies flat on the bottom of the plot"""
+    points = get_points([100, 1100], [0, 0], 0)
+    assert points == [(100, PLOT_BOTTOM), (1100, PLOT_BOTTOM)]
+
+
+def test_build_curve_path():
+    """Test moving to the first point and joining the rest with cubic Beziers"""
+    path = build_curve_path([(0, 0), (100, 50), (200, 0)])
+    assert path == "M0,0 C25.0,0 75.0,50 100,50 C125.0,50 175.0,0 200,0"
+
+
+def test_build_curve_path_empty():
+    """Test that an empty series has no path"""
+    assert build_curve_path([]) == ""
+
+
+def test_render_many(tmp_path):
+    """Test that every job is rendered to its own file, in job order"""
+    results = render_many([make_job("alice", tmp_path), make_job("bob", tmp_path)])
+    assert results == [
+        str((tmp_path / "alice-apache-ozone-contribution-graph.svg").absolute()),
+        str((tmp_path / "bob-apache-ozone-contribution-graph.svg").absolute()),
+    ]
+    for username, path in zip(("alice", "bob"), results):
+        svg = Path(path).read_text(encoding="utf-8")
+        assert "<svg" in svg
+        assert username in svg
+
+
+def test_render_many_job_error(tmp_path):
+    """Test that a failing job returns its exception without stopping the rest"""
+    not_a_dir = tmp_path / "not-a-dir"
+    not_a_dir.write_text("")
+    results = render_many(
+        [
+            make_job("alice", tmp_path),
+            make_job("bob", not_a_dir),
+            make_job("carol", tmp_path),
+        ]
+    )
+    assert isinstance(results[1], OSError)
+    assert Path(results[0]).exists()
+    assert Path(results[2]).exists()
@@ -83,4 +83,30 @@ def test_special_characters():
 def test_case_sensitivity():
     """Test parsing target with different cases"""
     result = parse_targets("User@Org/Repo")
-    assert result == [("User", "Org", "Repo")] 
\ No newline at end of file
+    assert result == [("User", "Org", "Repo")] 
+
+def test_repeated_and_surrounding_separators():
+    """Test parsing targets with repeated, leading and trailing separators"""
+    result = parse_targets(" ,peterxcli@apache/ozone ,, \n peterxcli@apache/hadoop, ")
+    assert result == [
+        ("peterxcli", "apache", "ozone"),
+        ("peterxcli", "apache", "hadoop")
+    ]
+
+def test_empty_repo():
+    """Test parsing target with nothing after the @ symbol"""
+    with pytest.raises(ValueError, match="Invalid target format"):
+        parse_targets("peterxcli@")
+
+def test_multiple_at_symbols_reports_whole_target():
+    """Test that targets with several @ symbols are reported in full"""
+    with pytest.raises(ValueError, match=r"^Invalid repository format: a@b@c/d$"):
+        parse_targets("a@b@c/d")
+    with pytest.raises(ValueError, match=r"^Invalid repository format: a@@b/c$"):
+        parse_targets("a@@b/c")
+
+def test_empty_side_of_at_error_prefix():
+    """Test that targets with an empty side of the @ name the target being parsed"""
+    for target in ("@apache/ozone", "peterxcli@", "@"):
+        with pytest.raises(ValueError, match=f"^Error parsing target '{target}': "):
+            parse_targets(target)
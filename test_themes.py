@@ -0,0 +1,72 @@
+import requests
+
+import themes as themes_module
+from themes import get_themes, parse_themes
+
+THEMES_JS = """
+export const themes = {
+  default: {
+    title_color: "2f80ed",
+    icon_color: "4c71f2",
+    text_color: "434d58",
+    bg_color: "fffefe",
+    border_color: "e4e2e2",
+  },
+  default_repocard: {
+    title_color: "2f80ed",
+    icon_color: "586069", // icon color is different
+    text_color: "434d58",
+    bg_color: "fffefe",
+  },
+  "github_dark": {
+    title_color: '58A6FF',
+    icon_color: "1F6FEB",
+    text_color: "C3D1D9",
+    bg_color: "0D1117",
+  },
+};
+
+export default themes;
+"""
+
+
+def test_parse_themes():
+    """Test parsing every theme block with its colors"""
+    themes = parse_themes(THEMES_JS)
+    assert list(themes) == ["default", "default_repocard", "github_dark"]
+    default = themes["default"]
+    assert default.title_color == "#2f80ed"
+    assert default.icon_color == "#4c71f2"
+    assert default.text_color == "#434d58"
+    assert default.bg_color == "#fffefe"
+    assert default.background_color == "#fffefe"
+    assert default.border_color == "#e4e2e2"
+
+
+def test_parse_themes_missing_border():
+    """Test that themes without a border color leave it unset"""
+    assert parse_themes(THEMES_JS)["github_dark"].border_color is None
+
+
+def test_parse_themes_comments_and_quotes():
+    """Test that trailing comments and single quotes do not drop attributes"""
+    themes = parse_themes(THEMES_JS)
+    assert themes["default_repocard"].icon_color == "#586069"
+    assert themes["default_repocard"].text_color == "#434d58"
+    assert themes["github_dark"].title_color == "#58A6FF"
+
+
+def test_get_themes_cache_round_trip(tmp_path, monkeypatch):
+    """Test that fetched themes are written to and reloaded from the cache file"""
+    monkeypatch.chdir(tmp_path)
+    response = requests.Response()
+    response.status_code = 200
+    response._content = THEMES_JS.encode()
+    monkeypatch.setattr(themes_module._SESSION, "get", lambda url, **kwargs: response)
+    monkeypatch.setattr(themes_module, "_THEMES_CACHE", None)
+    fetched = get_themes()
+    assert get_themes() is fetched
+    monkeypatch.setattr(themes_module, "_THEMES_CACHE", None)
+    monkeypatch.setattr(themes_module._SESSION, "get", None)
+    assert get_themes() == fetched
+    assert (tmp_path / themes_module.THEME_CACHE_JSON).exists()
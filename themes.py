@@ -1,20 +1,41 @@
 from __future__ import annotations
 
-import json
+import logging
 import os
+import re
+from dataclasses import dataclass
+from types import MappingProxyType
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 
 THEME_URI = "https://raw.githubusercontent.com/anuraghazra/github-readme-stats/refs/heads/master/themes/index.js"
 THEME_CACHE_JSON = "themes.json"
+THEME_FETCH_TIMEOUT = 10
 
+logger = logging.getLogger(__name__)
 
+# Themes loaded by get_themes, shared for the lifetime of the process
+_THEMES_CACHE: MappingProxyType[str, Theme] | None = None
+
+# Shared session, so repeated fetches reuse the pooled connection
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+_COMMENT_RE = re.compile(r"//[^\n]*")
+# `name: { ... }`, where the name may be quoted
+_THEME_BLOCK_RE = re.compile(r"""["']?([\w-]+)["']?\s*:\s*\{([^}]*)\}""")
+# `key: "value"` inside a theme block, with either quote style
+_THEME_ATTR_RE = re.compile(r"""["']?(\w+)["']?\s*:\s*["']([^"']*)["']""")
+
+
+@dataclass(frozen=True, slots=True)
 class Theme:
     """
     A class to represent a theme.
     """
 
-    # attributes
     title_color: str
     icon_color: str
     text_color: str
@@ -22,106 +43,74 @@ class Theme:
     background_color: str
     border_color: str | None = None
 
-    def __init__(
-        self,
-        title_color: str,
-        icon_color: str,
-        text_color: str,
-        bg_color: str,
-        background_color: str,
-        border_color: str | None = None,
-    ):
-        self.title_color = title_color
-        self.icon_color = icon_color
-        self.text_color = text_color
-        self.bg_color = bg_color
-        self.background_color = background_color
-        self.border_color = border_color
-
-
-def get_themes() -> dict[str, Theme]:
+
+def parse_themes(source: str) -> dict[str, Theme]:
     """
-    Fetch the themes from the GitHub repository.
+    Parse the themes object literal out of github-readme-stats' `themes/index.js`.
+
+    Args:
+        source (str): JavaScript source defining `themes = { name: { key: "value", ... }, ... }`
+
+    Returns:
+        dict[str, Theme]: Themes keyed by name, with colors prefixed by '#'
     """
-    if os.path.exists(THEME_CACHE_JSON):
-        print(f"Loading themes from cache: {THEME_CACHE_JSON}")
-        with open(THEME_CACHE_JSON, "r") as f:
-            result = json.load(f)
-            return {k: Theme(**v) for k, v in result.items()}
-
-    print(f"Fetching themes from {THEME_URI}...")
-    response = requests.get(THEME_URI)
-    if response.status_code != 200:
-        raise Exception(
-            f"Failed to fetch themes: {response.status_code} - {response.text}"
+    # Drop comments once up front, then the section holding the themes object
+    source = _COMMENT_RE.sub("", source)
+    section = source.split("themes = {", 1)[1].split("};", 1)[0]
+
+    result = {}
+    for theme_name, body in _THEME_BLOCK_RE.findall(section):
+        attrs = {key: f"#{value}" for key, value in _THEME_ATTR_RE.findall(body)}
+        bg_color = attrs.get("bg_color", "")
+        result[theme_name] = Theme(
+            title_color=attrs.get("title_color", ""),
+            icon_color=attrs.get("icon_color", ""),
+            text_color=attrs.get("text_color", ""),
+            bg_color=bg_color,
+            background_color=bg_color,  # Use bg_color as background_color
+            border_color=attrs.get("border_color"),
         )
+    return result
 
-    # Extract the themes from the response text
-    themes_text = response.text.split("themes = {")[1].split("};")[0]
 
-    # Parse themes into a dictionary
-    result = {}
+def get_themes() -> MappingProxyType[str, Theme]:
+    """
+    Fetch the themes from the GitHub repository.
+
+    The themes are loaded once per process and every caller shares the same
+    read-only view of them; use `dataclasses.replace` to derive a modified theme.
+    """
+    global _THEMES_CACHE
+    if _THEMES_CACHE is not None:
+        return _THEMES_CACHE
+
+    if os.path.exists(THEME_CACHE_JSON):
+        logger.info("Loading themes from cache: %s", THEME_CACHE_JSON)
+        with open(THEME_CACHE_JSON, "rb") as f:
+            result = orjson.loads(f.read())
+        _THEMES_CACHE = MappingProxyType({k: Theme(**v) for k, v in result.items()})
+        return _THEMES_CACHE
 
-    # Split by theme blocks
-    theme_blocks = themes_text.split("},")
-    for block in theme_blocks:
-        if not block.strip():
-            continue
-
-        # Extract theme name
-        theme_parts = block.strip().split(":", 1)
-        if len(theme_parts) < 2:
-            continue
-
-        theme_name = theme_parts[0].strip().strip("\"'")
-        theme_data = theme_parts[1].strip().lstrip("{").strip()
-
-        # Parse attributes
-        attrs = {}
-        for line in theme_data.split(","):
-            line = line.strip()
-            if not line or "//" in line:  # Skip comments
-                continue
-
-            key_value = line.split(":", 1)
-            if len(key_value) < 2:
-                continue
-
-            key = key_value[0].strip().strip("\"'")
-            value = key_value[1].strip().strip("\"',")
-
-            # Skip comments that might be on the same line
-            if "//" in value:
-                value = value.split("//")[0].strip().strip("\"',")
-
-            attrs[key] = f"#{value}"
-
-        # Create Theme object
-        try:
-            # Map to Theme attributes
-            bg_color = attrs.get("bg_color", "")
-            theme_obj = Theme(
-                title_color=attrs.get("title_color", ""),
-                icon_color=attrs.get("icon_color", ""),
-                text_color=attrs.get("text_color", ""),
-                bg_color=bg_color,
-                background_color=bg_color,  # Use bg_color as background_color
-                border_color=attrs.get("border_color"),
-            )
-            result[theme_name] = theme_obj
-        except Exception as e:
-            print(f"Error parsing theme {theme_name}: {e}")
+    logger.info("Fetching themes from %s...", THEME_URI)
+    with _SESSION.get(THEME_URI, timeout=THEME_FETCH_TIMEOUT, stream=True) as response:
+        response.raise_for_status()
+        source = response.text
+
+    result = parse_themes(source)
 
     # set cache
-    with open(THEME_CACHE_JSON, "w") as f:
-        json.dump({k: v.__dict__ for k, v in result.items()}, f, indent=4)
-        print(f"Cached themes to {THEME_CACHE_JSON}")
+    # orjson serializes the Theme dataclasses natively
+    with open(THEME_CACHE_JSON, "wb") as f:
+        f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+        logger.info("Cached themes to %s", THEME_CACHE_JSON)
     # return the themes
-    print(f"Fetched {len(result)} themes from {THEME_URI}")
-    return result
+    logger.info("Fetched %d themes from %s", len(result), THEME_URI)
+    _THEMES_CACHE = MappingProxyType(result)
+    return _THEMES_CACHE
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     themes = get_themes()
     # Print the themes
     print(themes)